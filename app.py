@@ -1,100 +1,115 @@
 from flask import Flask, request, jsonify, render_template, send_from_directory
 from flask_cors import CORS
-import easyocr
 import cv2
 import numpy as np
-import json
+import orjson
 import os
 import re
+import tempfile
 from datetime import datetime
 from werkzeug.utils import secure_filename
+from json_provider import ORJSONProvider
+from ocr_backend import configure_torch, create_reader, warm_up
+from ocr_cache import OCRCache, content_key
+from pattern_scan import PatternScanner
 import concurrent.futures
+import multiprocessing
+import torch
 from PIL import Image
 import io
 import base64
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
 # Configuration
-UPLOAD_FOLDER = 'uploads'
 RESULTS_FOLDER = 'results'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+MAX_IMAGE_SIDE = 1600  # Longer photos are downscaled before OCR
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['RESULTS_FOLDER'] = RESULTS_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 
 # Create directories if they don't exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(RESULTS_FOLDER, exist_ok=True)
 
 # Initialize EasyOCR reader (supports English by default)
-ocr_reader = easyocr.Reader(['en'])
+# Pool workers re-import this module, they load their own reader in _init_worker
+ocr_reader = None
+if multiprocessing.parent_process() is None:
+    configure_torch()
+    ocr_reader = create_reader(['en'])
+    warm_up(ocr_reader)
+
+# Cache extracted form data by image content so re-uploads skip OCR
+ocr_cache = OCRCache(os.path.join(RESULTS_FOLDER, 'ocr_cache.sqlite'))
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def preprocess_image(image_path):
-    """Preprocess image for better OCR results"""
-    image = cv2.imread(image_path)
-    
-    # Convert to grayscale
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    
-    # Apply Gaussian blur to reduce noise
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-    
-    # Apply threshold to get better contrast
-    _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+def decode_image(image_bytes):
+    """Decode uploaded image bytes in memory, straight to grayscale"""
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+
+def downscale_image(image):
+    """Shrink oversized photos before OCR, returns the image and the scale applied"""
+    height, width = image.shape[:2]
+    scale = min(1.0, MAX_IMAGE_SIDE / max(height, width))
+    if scale < 1.0:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return image, scale
+
+def preprocess_image(image):
+    """Preprocess a grayscale image for better OCR results, returns the image and its scale"""
+    image, scale = downscale_image(image)
     
-    # Morphological operations to clean up the image
-    kernel = np.ones((1, 1), np.uint8)
-    processed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+    # Local thresholding in a single pass, copes with uneven lighting on photos
+    processed = cv2.adaptiveThreshold(
+        image, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+    )
     
-    return processed
+    return processed, scale
 
-def extract_form_data(ocr_results):
-    """Extract structured form data from OCR results"""
-    text_blocks = []
-    
-    # Extract all text with coordinates
-    for (bbox, text, confidence) in ocr_results:
-        if confidence > 0.5:  # Filter low confidence results
-            text_blocks.append({
-                'text': text.strip(),
-                'confidence': confidence,
-                'bbox': bbox
-            })
+# Common form fields patterns, compiled once at import
+FORM_PATTERNS = [
+    ('name', re.compile(r'(?i)(name|full name|first name|last name)[:\s]*([a-zA-Z\s]+)')),
+    ('email', re.compile(r'(?i)(email|e-mail)[:\s]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})')),
+    ('phone', re.compile(r'(?i)(phone|mobile|tel)[:\s]*([+]?[\d\s\-\(\)]{10,})')),
+    ('address', re.compile(r'(?i)(address|addr)[:\s]*([a-zA-Z0-9\s,.-]+)')),
+    ('date', re.compile(r'(?i)(date|dob|birth)[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})')),
+    ('number', re.compile(r'(?i)(number|no|id)[:\s]*([a-zA-Z0-9]+)')),
+    ('amount', re.compile(r'(?i)(amount|total|sum|price)[:\s]*[\$]?(\d+\.?\d*)')),
+]
+FORM_SCANNER = PatternScanner(FORM_PATTERNS)
+
+def extract_form_data(ocr_results, scale=1.0):
+    """Extract structured form data from OCR results, bboxes are mapped back by scale"""
+    # Keep confident detections as parallel arrays in a single pass
+    kept = [(bbox, text.strip(), confidence)
+            for (bbox, text, confidence) in ocr_results if confidence > 0.5]
+    bboxes, texts, confidences = zip(*kept) if kept else ((), (), ())
+    confs = np.fromiter(confidences, dtype=np.float64, count=len(confidences))
+    # Top-left (x, y) corners as one (N, 2) array for the vectorized sort
+    corners = np.array([bbox[0] for bbox in bboxes], dtype=np.float64).reshape(-1, 2)
     
     # Sort by y-coordinate (top to bottom)
-    text_blocks.sort(key=lambda x: x['bbox'][0][1])
-    
-    # Common form fields patterns
-    form_patterns = {
-        'name': r'(?i)(name|full name|first name|last name)[:\s]*([a-zA-Z\s]+)',
-        'email': r'(?i)(email|e-mail)[:\s]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        'phone': r'(?i)(phone|mobile|tel)[:\s]*([+]?[\d\s\-\(\)]{10,})',
-        'address': r'(?i)(address|addr)[:\s]*([a-zA-Z0-9\s,.-]+)',
-        'date': r'(?i)(date|dob|birth)[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-        'number': r'(?i)(number|no|id)[:\s]*([a-zA-Z0-9]+)',
-        'amount': r'(?i)(amount|total|sum|price)[:\s]*[\$]?(\d+\.?\d*)',
-    }
+    order = np.argsort(corners[:, 1], kind='stable')
+    texts = [texts[i] for i in order]
     
     # Extract form fields
     form_data = {}
-    all_text = ' '.join([block['text'] for block in text_blocks])
+    all_text = ' '.join(texts)
     
     # Try to match patterns
-    for field, pattern in form_patterns.items():
-        matches = re.findall(pattern, all_text)
+    for field, pattern in FORM_SCANNER.matching(all_text):
+        matches = pattern.findall(all_text)
         if matches:
             form_data[field] = matches[0][1] if isinstance(matches[0], tuple) else matches[0]
     
     # Extract key-value pairs (field: value format)
-    for block in text_blocks:
-        text = block['text']
+    for text in texts:
         if ':' in text:
             parts = text.split(':', 1)
             if len(parts) == 2:
@@ -103,38 +118,78 @@ def extract_form_data(ocr_results):
                 if value:
                     form_data[key] = value
     
+    # Only build the JSON-shaped blocks once, in sorted order
+    text_blocks = [
+        {'text': texts[rank], 'confidence': confidences[i],
+         'bbox': [[x / scale, y / scale] for x, y in bboxes[i]] if scale != 1.0 else bboxes[i]}
+        for rank, i in enumerate(order)
+    ]
+    
     return {
         'extracted_fields': form_data,
         'raw_text': all_text,
         'text_blocks': text_blocks,
         'timestamp': datetime.now().isoformat(),
-        'total_confidence': sum([block['confidence'] for block in text_blocks]) / len(text_blocks) if text_blocks else 0
+        'total_confidence': float(confs.mean()) if confs.size else 0.0
     }
 
-def process_single_image(image_path):
-    """Process a single image and extract form data"""
+def process_single_image(image_bytes, filename):
+    """Process a single uploaded image and extract form data"""
     try:
-        # Preprocess image
-        processed_image = preprocess_image(image_path)
+        cache_key = content_key(image_bytes)
+        form_data = ocr_cache.get(cache_key)
         
-        # Perform OCR
-        ocr_results = ocr_reader.readtext(processed_image)
-        
-        # Extract form data
-        form_data = extract_form_data(ocr_results)
+        if form_data is None:
+            image = decode_image(image_bytes)
+            if image is None:
+                raise ValueError('Could not read image file')
+            
+            # Preprocess image
+            processed_image, scale = preprocess_image(image)
+            
+            # Perform OCR
+            with torch.inference_mode():
+                ocr_results = ocr_reader.readtext(processed_image)
+            
+            # Extract form data
+            form_data = extract_form_data(ocr_results, scale)
+            # Cache without the timestamp, responses are stamped when they are built
+            ocr_cache.set(cache_key, {k: v for k, v in form_data.items() if k != 'timestamp'})
+        else:
+            form_data = dict(form_data, timestamp=datetime.now().isoformat())
         
         return {
             'success': True,
             'data': form_data,
-            'filename': os.path.basename(image_path)
+            'filename': filename
         }
     except Exception as e:
         return {
             'success': False,
             'error': str(e),
-            'filename': os.path.basename(image_path)
+            'filename': filename
         }
 
+def _init_worker():
+    """Load a dedicated OCR reader once per batch worker process"""
+    global ocr_reader
+    
+    # One thread per worker so the processes don't oversubscribe the CPU,
+    # for whichever inference runtime the reader ends up on
+    configure_torch(1)
+    cv2.setNumThreads(1)
+    ocr_reader = create_reader(['en'], num_threads=1)
+    warm_up(ocr_reader)
+
+# Persistent process pool for batch uploads, workers keep their reader between requests
+ocr_pool = None
+if multiprocessing.parent_process() is None:
+    ocr_pool = concurrent.futures.ProcessPoolExecutor(
+        max_workers=max(1, (os.cpu_count() or 2) // 2),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker
+    )
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -152,16 +207,10 @@ def upload_files():
     results = []
     valid_files = []
     
-    # Save uploaded files
+    # Read uploads straight from the request stream, nothing touches disk
     for file in files:
         if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            # Add timestamp to avoid conflicts
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{timestamp}_{filename}"
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
-            valid_files.append(file_path)
+            valid_files.append((file.read(), secure_filename(file.filename)))
     
     if not valid_files:
         return jsonify({'error': 'No valid image files provided'}), 400
@@ -169,31 +218,30 @@ def upload_files():
     # Process images (can be parallelized for multiple images)
     if len(valid_files) == 1:
         # Single file processing
-        result = process_single_image(valid_files[0])
+        result = process_single_image(*valid_files[0])
         results.append(result)
     else:
-        # Batch processing with threading
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            future_to_file = {executor.submit(process_single_image, file_path): file_path 
-                            for file_path in valid_files}
-            
-            for future in concurrent.futures.as_completed(future_to_file):
-                result = future.result()
-                results.append(result)
+        # Batch processing across worker processes
+        future_to_file = {ocr_pool.submit(process_single_image, image_bytes, filename): filename 
+                        for image_bytes, filename in valid_files}
+        
+        for future in concurrent.futures.as_completed(future_to_file):
+            result = future.result()
+            results.append(result)
     
     # Save results
-    result_filename = f"results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    # Microseconds keep uploads finishing in the same second from overwriting each other
+    result_filename = f"results_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json"
     result_path = os.path.join(app.config['RESULTS_FOLDER'], result_filename)
     
-    with open(result_path, 'w') as f:
-        json.dump(results, f, indent=2)
-    
-    # Clean up uploaded files (optional)
-    for file_path in valid_files:
-        try:
-            os.remove(file_path)
-        except OSError:
-            pass
+    # Write to a temp file, sync it and rename so a crash never leaves a truncated
+    # result. mkstemp gives each request its own temp file, even for concurrent uploads
+    fd, tmp_path = tempfile.mkstemp(dir=app.config['RESULTS_FOLDER'], suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, result_path)
     
     return jsonify({
         'success': True,
@@ -207,8 +255,8 @@ def get_results(filename):
     """Retrieve saved results"""
     try:
         result_path = os.path.join(app.config['RESULTS_FOLDER'], filename)
-        with open(result_path, 'r') as f:
-            data = json.load(f)
+        with open(result_path, 'rb') as f:
+            data = orjson.loads(f.read())
         return jsonify(data)
     except FileNotFoundError:
         return jsonify({'error': 'Results not found'}), 404
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Gunicorn settings for the web deployment (web_app.py, also fits working_app.py)
+The app code is preloaded once in the master, each worker then loads its own OCR reader
+"""
+
+import os
+import sys
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+threads = 2
+timeout = 120
+preload_app = True
+
+# Read by web_app at import: don't load OCR in the master. OpenVINO and ONNX
+# Runtime don't guarantee their models and thread pools survive fork(), and a
+# loader thread caught mid-load would leave its lock held in every worker
+os.environ['OCR_LOAD_ON_IMPORT'] = '0'
+
+
+def post_fork(server, worker):
+    # Load the reader in the background so the worker boots (and answers
+    # /health) at once instead of blocking on the model within `timeout`.
+    # Other apps (working_app) have nothing to load
+    web_app = sys.modules.get('web_app')
+    if web_app is not None:
+        web_app.start_ocr_loader()
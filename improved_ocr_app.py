@@ -1,95 +1,138 @@
 #!/usr/bin/env python3
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
-import easyocr
 import cv2
 import numpy as np
 import os
 import json
 import re
+import threading
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from PIL import Image, ImageEnhance, ImageFilter
-import io
+from ocr_backend import configure_torch, create_reader, readtext_many, warm_up
+from ocr_cache import OCRCache, content_key
+from pattern_scan import PatternScanner
 
 app = Flask(__name__)
 CORS(app)
 
 # Configuration
-UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+MAX_IMAGE_SIDE = 1600  # Longer photos are downscaled before OCR
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 
-# Create upload directory
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
 # Initialize EasyOCR reader
 print("🤖 Initializing EasyOCR... This may take a moment on first run.")
 try:
-    ocr_reader = easyocr.Reader(['en'])
+    configure_torch()
+    ocr_reader = create_reader(['en'])
     print("✅ EasyOCR ready!")
 except Exception as e:
     print(f"❌ EasyOCR initialization failed: {e}")
     ocr_reader = None
 
+# Warm up single and batched inference so the first upload runs at full speed
+if ocr_reader:
+    warm_up(ocr_reader)
+    warm_up(ocr_reader, batch_size=4)
+
+# Cache extracted form data by image content so re-uploads skip OCR
+ocr_cache = OCRCache(os.path.join('results', 'ocr_cache_improved.sqlite'))
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def preprocess_image(image_path):
-    """Advanced image preprocessing for better OCR results"""
-    try:
-        # Read image
-        image = cv2.imread(image_path)
-        if image is None:
-            return None
-        
-        # Convert to RGB
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Convert to PIL for additional processing
-        pil_image = Image.fromarray(image_rgb)
-        
-        # Enhance contrast
-        enhancer = ImageEnhance.Contrast(pil_image)
-        pil_image = enhancer.enhance(1.5)
-        
-        # Enhance sharpness
-        enhancer = ImageEnhance.Sharpness(pil_image)
-        pil_image = enhancer.enhance(1.3)
-        
-        # Convert back to OpenCV format
-        enhanced_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+def decode_image(image_bytes, flags=cv2.IMREAD_COLOR):
+    """Decode uploaded image bytes in memory"""
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flags)
+
+def downscale_image(image):
+    """Shrink oversized photos before OCR, returns the image and the scale applied"""
+    height, width = image.shape[:2]
+    scale = min(1.0, MAX_IMAGE_SIDE / max(height, width))
+    if scale < 1.0:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return image, scale
+
+class Preprocessor(threading.local):
+    """Per-thread scratch buffers reused across preprocess_image calls"""
+    
+    def __init__(self):
+        self.shape = None
+    
+    def __call__(self, gray):
+        # Reallocate only when the image size changes
+        if gray.shape != self.shape:
+            self.enhanced = np.empty_like(gray)
+            self.blurred = np.empty_like(gray)
+            self.shape = gray.shape
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(enhanced_image, cv2.COLOR_BGR2GRAY)
+        # Enhance contrast around the mean brightness (same as PIL's Contrast(1.5))
+        cv2.addWeighted(gray, 1.5, gray, 0, -0.5 * float(gray.mean()), dst=self.enhanced)
         
         # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+        cv2.GaussianBlur(self.enhanced, (3, 3), 0, dst=self.blurred)
         
-        # Apply adaptive threshold for better text extraction
-        thresh = cv2.adaptiveThreshold(
-            blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+        # Apply adaptive threshold for better text extraction, into a fresh
+        # array since it is queued for batched OCR alongside other images
+        return cv2.adaptiveThreshold(
+            self.blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
         )
+
+preprocessor = Preprocessor()
+
+def preprocess_image(image_bytes):
+    """Advanced image preprocessing for better OCR results, returns the image and its scale"""
+    try:
+        # Read image straight to grayscale
+        gray = decode_image(image_bytes, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            return None, 1.0
+        gray, scale = downscale_image(gray)
         
-        # Apply morphological operations to clean up
-        kernel = np.ones((1, 1), np.uint8)
-        processed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-        
-        # Convert back to RGB for EasyOCR
-        processed_rgb = cv2.cvtColor(processed, cv2.COLOR_GRAY2RGB)
-        
-        return processed_rgb
+        # EasyOCR accepts single channel images directly
+        return preprocessor(gray), scale
         
     except Exception as e:
         print(f"⚠️ Preprocessing failed: {e}, using original image")
         # Fallback to original image
-        image = cv2.imread(image_path)
-        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB) if image is not None else None
+        image = decode_image(image_bytes)
+        if image is None:
+            return None, 1.0
+        image, scale = downscale_image(image)
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB), scale
+
+# Enhanced form field patterns, compiled once at import
+FORM_PATTERNS = [
+    ('first_name', re.compile(r'(?i)(first\s*name|given\s*name)[:\s]*([a-zA-Z]{2,20})')),
+    ('last_name', re.compile(r'(?i)(last\s*name|surname|family\s*name)[:\s]*([a-zA-Z]{2,20})')),
+    ('full_name', re.compile(r'(?i)(full\s*name|name)[:\s]*([a-zA-Z\s]{3,40})')),
+    ('email', re.compile(r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})')),
+    ('phone', re.compile(r'(?i)(phone|mobile|tel|call)[:\s]*([+]?[\d\s\-\(\)]{10,})')),
+    ('address', re.compile(r'(?i)(address|addr)[:\s]*([a-zA-Z0-9\s,.-]{10,80})')),
+    ('city', re.compile(r'(?i)(city)[:\s]*([a-zA-Z\s]{2,30})')),
+    ('state', re.compile(r'(?i)(state|province)[:\s]*([a-zA-Z\s]{2,20})')),
+    ('zip', re.compile(r'(?i)(zip|postal)[:\s]*([a-zA-Z0-9\s\-]{3,10})')),
+    ('date_of_birth', re.compile(r'(?i)(date\s*of\s*birth|dob|birth\s*date)[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})')),
+    ('date', re.compile(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})')),
+    ('ssn', re.compile(r'(?i)(ssn|social\s*security)[:\s]*(\d{3}[-\s]?\d{2}[-\s]?\d{4})')),
+    ('id_number', re.compile(r'(?i)(id|number|no)[:\s]*([a-zA-Z0-9]{3,})')),
+    ('amount', re.compile(r'(?i)(amount|total|sum|price|cost|pay)[:\s]*[\$]?(\d+\.?\d*)')),
+    ('company', re.compile(r'(?i)(company|business|employer|corp|inc|ltd)[:\s]*([a-zA-Z\s&\.]{3,40})')),
+    ('title', re.compile(r'(?i)(title|position|job)[:\s]*([a-zA-Z\s]{3,30})')),
+    ('department', re.compile(r'(?i)(department|dept)[:\s]*([a-zA-Z\s]{3,30})')),
+]
+FORM_SCANNER = PatternScanner(FORM_PATTERNS)
+EMAIL_RE = re.compile(r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b')
+PHONE_RE = re.compile(r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b')
+MONEY_RE = re.compile(r'\$\d+(?:\.\d{2})?')
+DATE_RE = re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b')
+# Checked in this order, so a block naming several ("Company Name:") ends on the last
+LABEL_FIELDS = ('name', 'email', 'phone', 'address', 'date', 'company')
 
-def extract_form_data(ocr_results):
+def extract_form_data(ocr_results, scale=1.0):
     """Enhanced form data extraction with better pattern matching"""
     if not ocr_results:
         return {
@@ -100,51 +143,27 @@ def extract_form_data(ocr_results):
             'total_confidence': 0.0
         }
     
-    text_blocks = []
-    
-    # Extract all text with confidence
-    for (bbox, text, confidence) in ocr_results:
-        if confidence > 0.2:  # Lower threshold for more text
-            # Convert NumPy types to Python native types for JSON serialization
-            text_blocks.append({
-                'text': str(text).strip(),
-                'confidence': float(confidence),
-                'bbox': [[float(point[0]), float(point[1])] for point in bbox]
-            })
+    # Keep confident detections as parallel arrays in a single pass
+    kept = [(bbox, str(text).strip(), confidence)
+            for (bbox, text, confidence) in ocr_results if confidence > 0.2]  # Lower threshold for more text
+    bboxes, texts, confidences = zip(*kept) if kept else ((), (), ())
+    confs = np.fromiter(confidences, dtype=np.float64, count=len(confidences))
+    # Top-left (x, y) corners as one (N, 2) array for the vectorized sort
+    corners = np.array([bbox[0] for bbox in bboxes], dtype=np.float64).reshape(-1, 2)
     
     # Sort by y-coordinate (top to bottom) then x-coordinate (left to right)
-    text_blocks.sort(key=lambda x: (x['bbox'][0][1], x['bbox'][0][0]))
+    order = np.lexsort((corners[:, 0], corners[:, 1]))
+    texts = [texts[i] for i in order]
     
     # Combine all text
-    all_text = ' '.join([block['text'] for block in text_blocks])
-    
-    # Enhanced form field patterns
-    form_patterns = {
-        'first_name': r'(?i)(first\s*name|given\s*name)[:\s]*([a-zA-Z]{2,20})',
-        'last_name': r'(?i)(last\s*name|surname|family\s*name)[:\s]*([a-zA-Z]{2,20})',
-        'full_name': r'(?i)(full\s*name|name)[:\s]*([a-zA-Z\s]{3,40})',
-        'email': r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        'phone': r'(?i)(phone|mobile|tel|call)[:\s]*([+]?[\d\s\-\(\)]{10,})',
-        'address': r'(?i)(address|addr)[:\s]*([a-zA-Z0-9\s,.-]{10,80})',
-        'city': r'(?i)(city)[:\s]*([a-zA-Z\s]{2,30})',
-        'state': r'(?i)(state|province)[:\s]*([a-zA-Z\s]{2,20})',
-        'zip': r'(?i)(zip|postal)[:\s]*([a-zA-Z0-9\s\-]{3,10})',
-        'date_of_birth': r'(?i)(date\s*of\s*birth|dob|birth\s*date)[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-        'date': r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-        'ssn': r'(?i)(ssn|social\s*security)[:\s]*(\d{3}[-\s]?\d{2}[-\s]?\d{4})',
-        'id_number': r'(?i)(id|number|no)[:\s]*([a-zA-Z0-9]{3,})',
-        'amount': r'(?i)(amount|total|sum|price|cost|pay)[:\s]*[\$]?(\d+\.?\d*)',
-        'company': r'(?i)(company|business|employer|corp|inc|ltd)[:\s]*([a-zA-Z\s&\.]{3,40})',
-        'title': r'(?i)(title|position|job)[:\s]*([a-zA-Z\s]{3,30})',
-        'department': r'(?i)(department|dept)[:\s]*([a-zA-Z\s]{3,30})',
-    }
+    all_text = ' '.join(texts)
     
     # Extract form fields
     form_data = {}
     
     # Try to match patterns in the full text
-    for field, pattern in form_patterns.items():
-        matches = re.findall(pattern, all_text)
+    for field, pattern in FORM_SCANNER.matching(all_text):
+        matches = pattern.findall(all_text)
         if matches:
             # Take the first valid match
             for match in matches:
@@ -158,108 +177,182 @@ def extract_form_data(ocr_results):
                     break
     
     # Look for standalone email addresses
-    email_pattern = r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b'
-    emails = re.findall(email_pattern, all_text)
+    emails = EMAIL_RE.findall(all_text)
     if emails and 'email' not in form_data:
         form_data['email'] = emails[0]
     
     # Look for standalone phone numbers
-    phone_pattern = r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b'
-    phones = re.findall(phone_pattern, all_text)
+    phones = PHONE_RE.findall(all_text)
     if phones and 'phone' not in form_data:
         form_data['phone'] = phones[0].strip()
     
     # Look for dollar amounts
-    money_pattern = r'\$\d+(?:\.\d{2})?'
-    amounts = re.findall(money_pattern, all_text)
+    amounts = MONEY_RE.findall(all_text)
     if amounts and 'amount' not in form_data:
         form_data['amount'] = amounts[0]
     
     # Look for dates
-    date_pattern = r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b'
-    dates = re.findall(date_pattern, all_text)
+    dates = DATE_RE.findall(all_text)
     if dates and 'date' not in form_data:
         form_data['date'] = dates[0]
     
     # Try to extract key-value pairs from nearby text blocks
-    for i, block in enumerate(text_blocks):
-        text = block['text'].lower()
+    for i, text in enumerate(texts[:-1]):
+        # Only labelled blocks with a usable next block can match, so skip the
+        # rest before lowercasing and scanning for field names
+        potential_value = texts[i + 1]
+        if ':' not in text or len(potential_value) <= 1:
+            continue
         
-        # Check if this block contains a field label
-        for field_name in ['name', 'email', 'phone', 'address', 'date', 'company']:
-            if field_name in text and ':' in text:
-                # Look for value in same block or next block
-                if i + 1 < len(text_blocks):
-                    next_block = text_blocks[i + 1]
-                    potential_value = next_block['text'].strip()
-                    if potential_value and len(potential_value) > 1:
-                        form_data[field_name] = potential_value
+        # Check if this block contains a field label, e.g. "Phone Number:"
+        text = text.lower()
+        for field_name in LABEL_FIELDS:
+            if field_name in text:
+                # Look for value in the next block
+                form_data[field_name] = potential_value
+    
+    # Only build the JSON-shaped blocks once, in sorted order
+    # Convert NumPy types to Python native types for JSON serialization
+    text_blocks = [{
+        'text': texts[rank],
+        'confidence': float(confidences[i]),
+        'bbox': [[float(point[0]) / scale, float(point[1]) / scale] for point in bboxes[i]]
+    } for rank, i in enumerate(order)]
     
     return {
         'extracted_fields': form_data,
         'raw_text': str(all_text),
         'text_blocks': text_blocks,
         'timestamp': datetime.now().isoformat(),
-        'total_confidence': float(sum([block['confidence'] for block in text_blocks]) / len(text_blocks)) if text_blocks else 0.0
+        'total_confidence': float(confs.mean()) if confs.size else 0.0
     }
 
-def process_image_ocr(image_path):
+def merge_ocr_results(first, second, iou_threshold=0.5):
+    """Combine two OCR passes over the same image, keeping the more confident of overlapping boxes"""
+    if not first or not second:
+        return list(first) + list(second)
+    
+    # Axis-aligned extents (x0, y0, x1, y1) of every box
+    a = np.array([bbox for bbox, _, _ in first], dtype=np.float64).reshape(-1, 4, 2)
+    b = np.array([bbox for bbox, _, _ in second], dtype=np.float64).reshape(-1, 4, 2)
+    a = np.concatenate([a.min(axis=1), a.max(axis=1)], axis=1)
+    b = np.concatenate([b.min(axis=1), b.max(axis=1)], axis=1)
+    
+    # Pairwise IoU between the two passes
+    width = np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    height = np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+    inter = np.clip(width, 0, None) * np.clip(height, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    iou = inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+    
+    conf_a = np.fromiter((conf for _, _, conf in first), dtype=np.float64, count=len(first))
+    conf_b = np.fromiter((conf for _, _, conf in second), dtype=np.float64, count=len(second))
+    overlap = iou > iou_threshold
+    drop_a = (overlap & (conf_b[None, :] > conf_a[:, None])).any(axis=1)
+    drop_b = (overlap & (conf_a[:, None] >= conf_b[None, :])).any(axis=0)
+    
+    return ([result for result, drop in zip(first, drop_a) if not drop] +
+            [result for result, drop in zip(second, drop_b) if not drop])
+
+def process_image_ocr(image_bytes, filename):
     """Process image with enhanced OCR"""
+    return process_images_ocr([(image_bytes, filename)])[0]
+
+def process_images_ocr(uploads):
+    """Process several images with enhanced OCR, batching recognition across them"""
     if not ocr_reader:
-        return {
+        return [{
             'success': False,
             'error': 'OCR reader not initialized',
-            'filename': os.path.basename(image_path)
-        }
+            'filename': filename
+        } for _, filename in uploads]
+    
+    results = [None] * len(uploads)
+    pending = []
+    
+    for index, (image_bytes, filename) in enumerate(uploads):
+        try:
+            print(f"🔍 Processing: {filename}")
+            
+            # Reuse the result of an identical earlier upload
+            cache_key = content_key(image_bytes)
+            cached = ocr_cache.get(cache_key)
+            if cached is not None:
+                print("♻️ Using cached OCR result")
+                results[index] = {
+                    'success': True,
+                    'data': dict(cached, timestamp=datetime.now().isoformat()),
+                    'filename': filename
+                }
+                continue
+            
+            # Preprocess image for better OCR
+            processed_image, scale = preprocess_image(image_bytes)
+            if processed_image is None:
+                results[index] = {
+                    'success': False,
+                    'error': 'Could not process image file',
+                    'filename': filename
+                }
+                continue
+            
+            pending.append((index, cache_key, processed_image, scale))
+            
+        except Exception as e:
+            print(f"❌ OCR Error: {str(e)}")
+            results[index] = {'success': False, 'error': str(e), 'filename': filename}
+    
+    if not pending:
+        return results
     
     try:
-        print(f"🔍 Processing: {os.path.basename(image_path)}")
-        
-        # Preprocess image for better OCR
-        processed_image = preprocess_image(image_path)
-        if processed_image is None:
-            return {
-                'success': False,
-                'error': 'Could not process image file',
-                'filename': os.path.basename(image_path)
-            }
-        
         # Perform OCR with different configurations for better results
-        print("🤖 Running enhanced OCR...")
+        print(f"🤖 Running enhanced OCR on {len(pending)} image(s)...")
         
-        # Try with default settings first
-        ocr_results = ocr_reader.readtext(processed_image, detail=1)
+        # Try with default settings first, batched across all images
+        batch_results = readtext_many(ocr_reader, [image for _, _, image, _ in pending], detail=1)
         
-        # If low confidence, try with different settings
-        if not ocr_results or sum([conf for _, _, conf in ocr_results]) / len(ocr_results) < 0.5:
-            print("🔄 Trying with enhanced settings...")
-            # Try with original image too
-            original_image = cv2.imread(image_path)
-            if original_image is not None:
-                original_rgb = cv2.cvtColor(original_image, cv2.COLOR_BGR2RGB)
-                ocr_results_orig = ocr_reader.readtext(original_rgb, detail=1)
-                
-                # Combine results from both attempts
-                ocr_results.extend(ocr_results_orig)
-        
-        print(f"📝 Found {len(ocr_results)} text regions")
+        # If preprocessing wiped out the text, try the original images too
+        retry = []
+        for position, ocr_results in enumerate(batch_results):
+            if len(ocr_results) < 3:
+                original_image = decode_image(uploads[pending[position][0]][0])
+                if original_image is not None:
+                    original_image, _ = downscale_image(original_image)
+                    retry.append((position, cv2.cvtColor(original_image, cv2.COLOR_BGR2RGB)))
         
-        # Extract form data
-        form_data = extract_form_data(ocr_results)
+        if retry:
+            print("🔄 Trying with enhanced settings...")
+            retry_results = readtext_many(ocr_reader, [image for _, image in retry], detail=1)
+            for (position, _), ocr_results_orig in zip(retry, retry_results):
+                # Combine results from both attempts without duplicate boxes
+                batch_results[position] = merge_ocr_results(batch_results[position], ocr_results_orig)
         
-        return {
-            'success': True,
-            'data': form_data,
-            'filename': os.path.basename(image_path)
-        }
+        for (index, cache_key, _, scale), ocr_results in zip(pending, batch_results):
+            print(f"📝 Found {len(ocr_results)} text regions")
+            
+            # Extract form data
+            form_data = extract_form_data(ocr_results, scale)
+            # Cache without the timestamp, responses are stamped when they are built
+            ocr_cache.set(cache_key, {k: v for k, v in form_data.items() if k != 'timestamp'})
+            
+            results[index] = {
+                'success': True,
+                'data': form_data,
+                'filename': uploads[index][1]
+            }
         
     except Exception as e:
         print(f"❌ OCR Error: {str(e)}")
-        return {
-            'success': False,
-            'error': str(e),
-            'filename': os.path.basename(image_path)
-        }
+        for index, _, _, _ in pending:
+            results[index] = {
+                'success': False,
+                'error': str(e),
+                'filename': uploads[index][1]
+            }
+    
+    return results
 
 @app.route('/')
 def serve_interface():
@@ -281,27 +374,15 @@ def upload_files():
         if not files or all(file.filename == '' for file in files):
             return jsonify({'error': 'No files selected'}), 400
         
-        results = []
+        uploads = []
         
+        # Read uploads straight from the request stream, nothing touches disk
         for file in files:
             if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                unique_filename = f"{timestamp}_{filename}"
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                
-                # Save file
-                file.save(file_path)
-                
-                # Process with enhanced OCR
-                result = process_image_ocr(file_path)
-                results.append(result)
-                
-                # Clean up uploaded file
-                try:
-                    os.remove(file_path)
-                except:
-                    pass
+                uploads.append((file.read(), secure_filename(file.filename)))
+        
+        # Process all images with batched enhanced OCR
+        results = process_images_ocr(uploads)
         
         print(f"✅ Processed {len(results)} files")
         
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Inference backends for the EasyOCR reader
+Recompiles the CRAFT detector and CRNN recognizer for faster CPU inference
+"""
+
+import os
+from abc import ABC, abstractmethod
+
+import cv2
+import easyocr
+import numpy as np
+import torch
+
+# 'openvino' (default), 'onnxruntime' for INT8 ONNX models,
+# or 'torch' to keep EasyOCR's stock PyTorch models
+OCR_BACKEND = os.environ.get('OCR_BACKEND', 'openvino').lower()
+MODEL_CACHE_DIR = os.environ.get('OCR_MODEL_CACHE', 'models')
+# Folder of sample form images used to calibrate the INT8 detector
+CALIBRATION_DIR = os.environ.get('OCR_CALIBRATION_DIR')
+
+
+class CompiledModule(ABC):
+    """Drop-in replacement for a torch module backed by another runtime"""
+
+    def __init__(self, input_count):
+        self.input_count = input_count
+
+    def __call__(self, *inputs):
+        # Unused inputs (e.g. the CTC recognizer's text tensor) are pruned on export
+        arrays = [x.detach().cpu().numpy() for x in inputs[:self.input_count]]
+        outputs = tuple(torch.from_numpy(out) for out in self.run(arrays))
+        return outputs if len(outputs) > 1 else outputs[0]
+
+    @abstractmethod
+    def run(self, arrays):
+        """Run the compiled model on numpy inputs, returning a list of numpy outputs"""
+
+    def eval(self):
+        return self
+
+    def to(self, *args, **kwargs):
+        return self
+
+
+class OpenVINOModule(CompiledModule):
+    """Module backed by a compiled OpenVINO model"""
+
+    def __init__(self, compiled_model):
+        super().__init__(len(compiled_model.inputs))
+        self.compiled_model = compiled_model
+        self.output_layers = list(compiled_model.outputs)
+
+    def run(self, arrays):
+        # One infer request per call so concurrent Flask threads don't share state
+        request = self.compiled_model.create_infer_request()
+        results = request.infer(arrays)
+        return [results[layer] for layer in self.output_layers]
+
+
+class OnnxRuntimeModule(CompiledModule):
+    """Module backed by an ONNX Runtime inference session"""
+
+    def __init__(self, session):
+        self.input_names = [i.name for i in session.get_inputs()]
+        super().__init__(len(self.input_names))
+        self.session = session
+
+    def run(self, arrays):
+        return self.session.run(None, dict(zip(self.input_names, arrays)))
+
+
+def _compile_openvino(core, torch_model, name, example_input, num_threads=None):
+    """Convert a torch model to OpenVINO IR once, cache it on disk and compile it"""
+    import openvino as ov
+
+    ir_path = os.path.join(MODEL_CACHE_DIR, 'openvino', f'{name}.xml')
+    if os.path.exists(ir_path):
+        ov_model = core.read_model(ir_path)
+    else:
+        with torch.no_grad():
+            ov_model = ov.convert_model(torch_model.eval(), example_input=example_input)
+        os.makedirs(os.path.dirname(ir_path), exist_ok=True)
+        ov.save_model(ov_model, ir_path)
+
+    # OpenVINO uses every core unless told otherwise
+    config = {'INFERENCE_NUM_THREADS': num_threads} if num_threads else {}
+    try:
+        return core.compile_model(ov_model, 'CPU', dict(config, INFERENCE_PRECISION_HINT='f16'))
+    except Exception:
+        # Older CPUs / runtimes reject the f16 hint, fall back to the default precision
+        return core.compile_model(ov_model, 'CPU', config)
+
+
+def use_openvino(reader, lang_list, num_threads=None):
+    """Swap the reader's detector and recognizer for OpenVINO compiled models"""
+    import openvino as ov
+
+    core = ov.Core()
+    suffix = '_'.join(lang_list)
+
+    detector = _compile_openvino(
+        core, reader.detector, f'craft_{suffix}',
+        (torch.zeros(1, 3, 640, 640),), num_threads
+    )
+    recognizer = _compile_openvino(
+        core, reader.recognizer, f'crnn_{suffix}',
+        (torch.zeros(1, 1, 64, 256), torch.zeros(1, 26, dtype=torch.long)), num_threads
+    )
+
+    reader.detector = OpenVINOModule(detector)
+    reader.recognizer = OpenVINOModule(recognizer)
+    return reader
+
+
+class CalibrationReader:
+    """Feeds sample form images to ONNX Runtime static quantization"""
+
+    def __init__(self, input_name, folder, size=640):
+        import cv2
+        from easyocr.imgproc import normalizeMeanVariance
+
+        self.batches = []
+        for name in sorted(os.listdir(folder)):
+            image = cv2.imread(os.path.join(folder, name))
+            if image is None:
+                continue
+            image = cv2.resize(cv2.cvtColor(image, cv2.COLOR_BGR2RGB), (size, size))
+            tensor = normalizeMeanVariance(image).transpose(2, 0, 1)[None].astype('float32')
+            self.batches.append({input_name: tensor})
+        self.position = 0
+
+    def get_next(self):
+        if self.position >= len(self.batches):
+            return None
+        self.position += 1
+        return self.batches[self.position - 1]
+
+
+def _quantize_onnx(torch_model, name, example_input, input_names, output_names, dynamic_axes):
+    """Export a torch model to ONNX once and cache an INT8 quantized copy"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic, quantize_static
+
+    onnx_dir = os.path.join(MODEL_CACHE_DIR, 'onnx')
+    fp32_path = os.path.join(onnx_dir, f'{name}.onnx')
+    int8_path = os.path.join(onnx_dir, f'{name}_int8.onnx')
+    if os.path.exists(int8_path):
+        return int8_path
+
+    if not os.path.exists(fp32_path):
+        os.makedirs(onnx_dir, exist_ok=True)
+        with torch.no_grad():
+            torch.onnx.export(
+                torch_model.eval(), example_input, fp32_path,
+                input_names=input_names, output_names=output_names,
+                dynamic_axes=dynamic_axes, opset_version=17
+            )
+
+    if name.startswith('crnn'):
+        # LSTM/Linear heavy recognizer: dynamic quantization needs no calibration
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    elif CALIBRATION_DIR:
+        # Conv heavy detector: static quantization calibrated on sample forms
+        calibration = CalibrationReader(input_names[0], CALIBRATION_DIR)
+        quantize_static(fp32_path, int8_path, calibration, weight_type=QuantType.QInt8)
+    else:
+        return fp32_path
+    return int8_path
+
+
+def use_onnxruntime(reader, lang_list, num_threads=None):
+    """Swap the reader's detector and recognizer for INT8 ONNX Runtime sessions"""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = num_threads or os.cpu_count() or 1
+    options.inter_op_num_threads = 1
+    suffix = '_'.join(lang_list)
+
+    detector_path = _quantize_onnx(
+        reader.detector, f'craft_{suffix}', (torch.zeros(1, 3, 640, 640),),
+        ['image'], ['y', 'feature'],
+        {'image': {0: 'batch', 2: 'height', 3: 'width'},
+         'y': {0: 'batch', 1: 'height', 2: 'width'},
+         'feature': {0: 'batch', 2: 'height', 3: 'width'}}
+    )
+    recognizer_path = _quantize_onnx(
+        reader.recognizer, f'crnn_{suffix}',
+        (torch.zeros(1, 1, 64, 256), torch.zeros(1, 26, dtype=torch.long)),
+        ['image', 'text'], ['preds'],
+        {'image': {0: 'batch', 3: 'width'}, 'text': {0: 'batch', 1: 'length'},
+         'preds': {0: 'batch', 1: 'steps'}}
+    )
+
+    providers = ['CPUExecutionProvider']
+    reader.detector = OnnxRuntimeModule(ort.InferenceSession(detector_path, options, providers=providers))
+    reader.recognizer = OnnxRuntimeModule(ort.InferenceSession(recognizer_path, options, providers=providers))
+    return reader
+
+
+def configure_torch(num_threads=None):
+    """Tune PyTorch's CPU threading for OCR, call before creating the reader"""
+    if num_threads is None:
+        # Leave a core free for Flask and image decoding
+        num_threads = max(1, (os.cpu_count() or 1) - 1)
+    torch.set_num_threads(num_threads)
+    try:
+        # One inference runs at a time per reader, inter-op threads only add overhead
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set before any inter-op work has started
+        pass
+    torch.backends.mkldnn.enabled = True
+
+
+BACKENDS = {
+    'openvino': use_openvino,
+    'onnxruntime': use_onnxruntime,
+}
+
+
+def create_reader(lang_list, num_threads=None, **kwargs):
+    """Create an EasyOCR reader using the configured inference backend
+
+    num_threads caps the backend runtime's CPU threads, pass the same value
+    given to configure_torch so processes sharing the CPU don't oversubscribe it
+    """
+    backend = BACKENDS.get(OCR_BACKEND)
+    if backend is None:
+        return easyocr.Reader(lang_list, **kwargs)
+
+    # Export needs the unquantized FP32 torch graphs
+    kwargs.setdefault('gpu', False)
+    reader = easyocr.Reader(lang_list, quantize=False, **kwargs)
+    try:
+        backend(reader, lang_list, num_threads)
+        print(f"⚡ EasyOCR running on {OCR_BACKEND}")
+    except Exception as e:
+        print(f"⚠️ {OCR_BACKEND} backend unavailable ({e}), using PyTorch")
+        # Restore the int8 dynamic quantization EasyOCR applies by default on CPU
+        torch.quantization.quantize_dynamic(reader.detector, dtype=torch.qint8, inplace=True)
+        torch.quantization.quantize_dynamic(reader.recognizer, dtype=torch.qint8, inplace=True)
+    return reader
+
+
+def readtext_many(reader, images, batch_size=16, **kwargs):
+    """Run OCR over several images, batching the ones that share a shape"""
+    results = [None] * len(images)
+
+    # readtext_batched stacks images for detection, so it needs equal shapes;
+    # grouping avoids resizing (and distorting) mismatched photos
+    groups = {}
+    for index, image in enumerate(images):
+        groups.setdefault(image.shape, []).append(index)
+
+    with torch.inference_mode():
+        for group in groups.values():
+            # The whole list goes through the detector in one forward pass, and
+            # batch_size only limits recognizer crops, so cap the images per call
+            for start in range(0, len(group), batch_size):
+                indices = group[start:start + batch_size]
+                if len(indices) == 1:
+                    results[indices[0]] = reader.readtext(images[indices[0]], **kwargs)
+                    continue
+
+                batch = reader.readtext_batched(
+                    [images[i] for i in indices],
+                    batch_size=len(indices),
+                    **kwargs
+                )
+                for index, ocr_results in zip(indices, batch):
+                    results[index] = ocr_results
+
+    return results
+
+
+def warm_up(reader, batch_size=1):
+    """Run a throwaway inference so the first real request hits a hot reader"""
+    # Draw real text so the recognizer runs too, a blank image only reaches the detector
+    image = np.full((64, 256, 3), 255, dtype=np.uint8)
+    cv2.putText(image, 'Warmup 123', (8, 44), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+    try:
+        with torch.inference_mode():
+            if batch_size > 1:
+                reader.readtext_batched([image] * batch_size)
+            else:
+                reader.readtext(image)
+    except Exception as e:
+        print(f"⚠️ EasyOCR warmup failed: {e}")
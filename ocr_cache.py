@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for OCR results
+Keeps recent results in memory and, when OCR_CACHE_PERSIST=1, in a bounded
+SQLite table across restarts. Entries expire after OCR_CACHE_TTL seconds
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Results hold extracted form fields (names, phones, SSNs...) in plain text,
+# so writing them to disk is opt-in
+PERSIST = os.environ.get('OCR_CACHE_PERSIST', '0') == '1'
+MAX_ROWS = int(os.environ.get('OCR_CACHE_MAX_ROWS', 10000))
+TTL = float(os.environ.get('OCR_CACHE_TTL', 7 * 24 * 3600))
+
+
+def content_key(data):
+    """Hash raw image bytes into a cache key"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class OCRCache:
+    """Bounded in-memory LRU in front of a small SQLite key -> JSON table"""
+
+    def __init__(self, path=None, maxsize=256, max_rows=MAX_ROWS, ttl=TTL):
+        self.path = path if PERSIST else None
+        self.maxsize = maxsize
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        # Separate locks so in-memory hits never wait behind a disk write
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = None
+        # One writer thread keeps disk writes ordered and off the request thread
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ocr-cache') if self.path else None
+
+    def _connect(self):
+        # Connect lazily so forked worker processes open their own handle
+        if self._db is None and self.path:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS ocr_cache '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL DEFAULT 0)'
+            )
+            try:
+                # Tables from before expiry was added: their rows count as expired
+                self._db.execute('ALTER TABLE ocr_cache ADD COLUMN created REAL NOT NULL DEFAULT 0')
+            except sqlite3.OperationalError:
+                pass
+            self._db.execute('CREATE INDEX IF NOT EXISTS ocr_cache_created ON ocr_cache (created)')
+        return self._db
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached result for key, or None on a miss"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] >= cutoff:
+                    self._memory.move_to_end(key)
+                    return entry[0]
+                del self._memory[key]
+
+        if not self.path:
+            return None
+        with self._db_lock:
+            row = self._connect().execute(
+                'SELECT value, created FROM ocr_cache WHERE key = ? AND created >= ?', (key, cutoff)
+            ).fetchone()
+        if row is None:
+            return None
+
+        value = json.loads(row[0])
+        with self._lock:
+            # A set() that raced this read holds the newer value, keep it
+            if key in self._memory:
+                return self._memory[key][0]
+            self._remember(key, value, row[1])
+        return value
+
+    def set(self, key, value):
+        """Store a result in memory now and queue it for disk"""
+        created = time.time()
+        with self._lock:
+            self._remember(key, value, created)
+        if self._writer is not None:
+            # NumPy scalars/arrays from EasyOCR serialize via tolist()
+            payload = json.dumps(value, default=lambda o: o.tolist())
+            self._writer.submit(self._write, key, payload, created)
+
+    def _write(self, key, payload, created):
+        try:
+            with self._db_lock:
+                db = self._connect()
+                with db:
+                    db.execute(
+                        'INSERT OR REPLACE INTO ocr_cache (key, value, created) VALUES (?, ?, ?)',
+                        (key, payload, created)
+                    )
+                    # Keep the table bounded: drop expired rows, then the oldest past max_rows
+                    db.execute('DELETE FROM ocr_cache WHERE created < ?', (created - self.ttl,))
+                    db.execute(
+                        'DELETE FROM ocr_cache WHERE key IN '
+                        '(SELECT key FROM ocr_cache ORDER BY created DESC LIMIT -1 OFFSET ?)',
+                        (self.max_rows,)
+                    )
+        except Exception as e:
+            print(f"⚠️ Could not persist OCR cache entry: {e}")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Multi-pattern prefilter for form field regexes
+One Hyperscan pass finds which patterns occur so re only runs on those
+"""
+
+import threading
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+class PatternScanner:
+    """Reports which of a list of (field, compiled regex) pairs match a text"""
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+        self._db = None
+        self._local = threading.local()
+
+        if hyperscan is None:
+            return
+        try:
+            # Existence is all we need, so report each pattern at most once
+            flags = hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[pattern.pattern.encode('utf-8') for _, pattern in patterns],
+                ids=list(range(len(patterns))),
+                elements=len(patterns),
+                flags=[flags] * len(patterns)
+            )
+            self._db = db
+        except Exception as e:
+            print(f"⚠️ Hyperscan unavailable ({e}), scanning with re only")
+
+    def _scratch(self):
+        # Hyperscan scratch space must not be shared between threads
+        scratch = getattr(self._local, 'scratch', None)
+        if scratch is None:
+            scratch = self._local.scratch = hyperscan.Scratch(self._db)
+        return scratch
+
+    def matching(self, text):
+        """Return the (field, pattern) pairs that match somewhere in text, in order"""
+        if self._db is None:
+            return self.patterns
+
+        hits = set()
+
+        def on_match(pattern_id, start, end, flags, context):
+            hits.add(pattern_id)
+
+        self._db.scan(text.encode('utf-8'), match_event_handler=on_match, scratch=self._scratch())
+        return [self.patterns[i] for i in sorted(hits)]
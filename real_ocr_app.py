@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
-import easyocr
 import cv2
 import numpy as np
 import os
@@ -9,6 +8,9 @@ import json
 import re
 from datetime import datetime
 from werkzeug.utils import secure_filename
+from ocr_backend import configure_torch, create_reader, readtext_many, warm_up
+from ocr_cache import OCRCache, content_key
+from pattern_scan import PatternScanner
 from PIL import Image
 import io
 
@@ -16,29 +18,61 @@ app = Flask(__name__)
 CORS(app)
 
 # Configuration
-UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+MAX_IMAGE_SIDE = 1600  # Longer photos are downscaled before OCR
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 
-# Create upload directory
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
 # Initialize EasyOCR reader
 print("🤖 Initializing EasyOCR... This may take a moment on first run.")
 try:
-    ocr_reader = easyocr.Reader(['en'])
+    configure_torch()
+    ocr_reader = create_reader(['en'])
     print("✅ EasyOCR ready!")
 except Exception as e:
     print(f"❌ EasyOCR initialization failed: {e}")
     ocr_reader = None
 
+# Warm up single and batched inference so the first upload runs at full speed
+if ocr_reader:
+    warm_up(ocr_reader)
+    warm_up(ocr_reader, batch_size=4)
+
+# Cache extracted form data by image content so re-uploads skip OCR
+ocr_cache = OCRCache(os.path.join('results', 'ocr_cache_real.sqlite'))
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def extract_form_data(ocr_results):
+def decode_image(image_bytes, flags=cv2.IMREAD_COLOR):
+    """Decode uploaded image bytes in memory"""
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flags)
+
+def downscale_image(image):
+    """Shrink oversized photos before OCR, returns the image and the scale applied"""
+    height, width = image.shape[:2]
+    scale = min(1.0, MAX_IMAGE_SIDE / max(height, width))
+    if scale < 1.0:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return image, scale
+
+# Common form fields patterns, compiled once at import
+FORM_PATTERNS = [
+    ('name', re.compile(r'(?i)(name|full name|first name|last name)[:\s]*([a-zA-Z\s]{2,30})')),
+    ('email', re.compile(r'(?i)(email|e-mail)[:\s]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})')),
+    ('phone', re.compile(r'(?i)(phone|mobile|tel|call)[:\s]*([+]?[\d\s\-\(\)]{10,})')),
+    ('address', re.compile(r'(?i)(address|addr)[:\s]*([a-zA-Z0-9\s,.-]{5,50})')),
+    ('date', re.compile(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})')),
+    ('number', re.compile(r'(?i)(number|no|id)[:\s]*([a-zA-Z0-9]{3,})')),
+    ('amount', re.compile(r'(?i)(amount|total|sum|price|cost|pay)[:\s]*[\$]?(\d+\.?\d*)')),
+    ('company', re.compile(r'(?i)(company|business|corp|inc|ltd)[:\s]*([a-zA-Z\s&]{3,30})')),
+]
+FORM_SCANNER = PatternScanner(FORM_PATTERNS)
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_RE = re.compile(r'[\+]?[\d\s\-\(\)]{10,}')
+
+def extract_form_data(ocr_results, scale=1.0):
     """Extract structured form data from OCR results"""
     if not ocr_results:
         return {
@@ -49,42 +83,28 @@ def extract_form_data(ocr_results):
             'total_confidence': 0.0
         }
     
-    text_blocks = []
-    
-    # Extract all text with confidence
-    for (bbox, text, confidence) in ocr_results:
-        if confidence > 0.3:  # Lower threshold for better extraction
-            # Convert NumPy types to Python native types for JSON serialization
-            text_blocks.append({
-                'text': str(text).strip(),
-                'confidence': float(confidence),
-                'bbox': [[float(point[0]), float(point[1])] for point in bbox]
-            })
+    # Keep confident detections as parallel arrays in a single pass
+    kept = [(bbox, str(text).strip(), confidence)
+            for (bbox, text, confidence) in ocr_results if confidence > 0.3]  # Lower threshold for better extraction
+    bboxes, texts, confidences = zip(*kept) if kept else ((), (), ())
+    confs = np.fromiter(confidences, dtype=np.float64, count=len(confidences))
+    # Top-left (x, y) corners as one (N, 2) array for the vectorized sort
+    corners = np.array([bbox[0] for bbox in bboxes], dtype=np.float64).reshape(-1, 2)
     
     # Sort by y-coordinate (top to bottom)
-    text_blocks.sort(key=lambda x: x['bbox'][0][1])
+    order = np.argsort(corners[:, 1], kind='stable')
+    texts = [texts[i] for i in order]
     
-    # Combine all text
-    all_text = ' '.join([block['text'] for block in text_blocks])
-    
-    # Common form fields patterns
-    form_patterns = {
-        'name': r'(?i)(name|full name|first name|last name)[:\s]*([a-zA-Z\s]{2,30})',
-        'email': r'(?i)(email|e-mail)[:\s]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        'phone': r'(?i)(phone|mobile|tel|call)[:\s]*([+]?[\d\s\-\(\)]{10,})',
-        'address': r'(?i)(address|addr)[:\s]*([a-zA-Z0-9\s,.-]{5,50})',
-        'date': r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-        'number': r'(?i)(number|no|id)[:\s]*([a-zA-Z0-9]{3,})',
-        'amount': r'(?i)(amount|total|sum|price|cost|pay)[:\s]*[\$]?(\d+\.?\d*)',
-        'company': r'(?i)(company|business|corp|inc|ltd)[:\s]*([a-zA-Z\s&]{3,30})',
-    }
+    # Combine all text, and split it into tokens once for the key-value scan
+    all_text = ' '.join(texts)
+    tokens = [token for text in texts for token in text.split()]
     
     # Extract form fields
     form_data = {}
     
     # Try to match patterns in the full text
-    for field, pattern in form_patterns.items():
-        matches = re.findall(pattern, all_text)
+    for field, pattern in FORM_SCANNER.matching(all_text):
+        matches = pattern.findall(all_text)
         if matches:
             # Take the first match and clean it
             if isinstance(matches[0], tuple):
@@ -96,79 +116,121 @@ def extract_form_data(ocr_results):
                 form_data[field] = value
     
     # Also look for key-value pairs (field: value format)
-    lines = all_text.split()
-    for i, word in enumerate(lines):
-        if ':' in word and i < len(lines) - 1:
-            key = word.replace(':', '').strip().lower()
-            value = lines[i + 1].strip()
+    for i, word in enumerate(tokens[:-1]):
+        if ':' in word:
+            key = word.replace(':', '').lower()
+            value = tokens[i + 1]
             if len(key) > 1 and len(value) > 1:
                 form_data[key] = value
     
     # Look for email patterns anywhere in text
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    emails = re.findall(email_pattern, all_text)
+    emails = EMAIL_RE.findall(all_text)
     if emails:
         form_data['email'] = emails[0]
     
     # Look for phone patterns
-    phone_pattern = r'[\+]?[\d\s\-\(\)]{10,}'
-    phones = re.findall(phone_pattern, all_text)
+    phones = PHONE_RE.findall(all_text)
     if phones:
         form_data['phone'] = phones[0].strip()
     
+    # Only build the JSON-shaped blocks once, in sorted order
+    # Convert NumPy types to Python native types for JSON serialization
+    text_blocks = [{
+        'text': texts[rank],
+        'confidence': float(confidences[i]),
+        'bbox': [[float(point[0]) / scale, float(point[1]) / scale] for point in bboxes[i]]
+    } for rank, i in enumerate(order)]
+    
     return {
         'extracted_fields': form_data,
         'raw_text': str(all_text),
         'text_blocks': text_blocks,
         'timestamp': datetime.now().isoformat(),
-        'total_confidence': float(sum([block['confidence'] for block in text_blocks]) / len(text_blocks)) if text_blocks else 0.0
+        'total_confidence': float(confs.mean()) if confs.size else 0.0
     }
 
-def process_image_ocr(image_path):
+def process_image_ocr(image_bytes, filename):
     """Process image with OCR"""
+    return process_images_ocr([(image_bytes, filename)])[0]
+
+def process_images_ocr(uploads):
+    """Process several images with OCR, batching the recognition across them"""
     if not ocr_reader:
-        return {
+        return [{
             'success': False,
             'error': 'OCR reader not initialized',
-            'filename': os.path.basename(image_path)
-        }
+            'filename': filename
+        } for _, filename in uploads]
+    
+    results = [None] * len(uploads)
+    pending = []
+    
+    for index, (image_bytes, filename) in enumerate(uploads):
+        try:
+            print(f"🔍 Processing: {filename}")
+            
+            # Reuse the result of an identical earlier upload
+            cache_key = content_key(image_bytes)
+            cached = ocr_cache.get(cache_key)
+            if cached is not None:
+                print("♻️ Using cached OCR result")
+                results[index] = {
+                    'success': True,
+                    'data': dict(cached, timestamp=datetime.now().isoformat()),
+                    'filename': filename
+                }
+                continue
+            
+            # Read image
+            image = decode_image(image_bytes)
+            if image is None:
+                results[index] = {
+                    'success': False,
+                    'error': 'Could not read image file',
+                    'filename': filename
+                }
+                continue
+            
+            # Convert to RGB for EasyOCR
+            image, scale = downscale_image(image)
+            pending.append((index, cache_key, cv2.cvtColor(image, cv2.COLOR_BGR2RGB), scale))
+            
+        except Exception as e:
+            print(f"❌ OCR Error: {str(e)}")
+            results[index] = {'success': False, 'error': str(e), 'filename': filename}
+    
+    if not pending:
+        return results
     
     try:
-        print(f"🔍 Processing: {os.path.basename(image_path)}")
+        # Perform OCR on all remaining images at once
+        print(f"🤖 Running OCR on {len(pending)} image(s)...")
+        batch_results = readtext_many(ocr_reader, [image for _, _, image, _ in pending])
         
-        # Read image
-        image = cv2.imread(image_path)
-        if image is None:
-            return {
-                'success': False,
-                'error': 'Could not read image file',
-                'filename': os.path.basename(image_path)
+        for (index, cache_key, _, scale), ocr_results in zip(pending, batch_results):
+            print(f"📝 Found {len(ocr_results)} text regions")
+            
+            # Extract form data
+            form_data = extract_form_data(ocr_results, scale)
+            # Cache without the timestamp, responses are stamped when they are built
+            ocr_cache.set(cache_key, {k: v for k, v in form_data.items() if k != 'timestamp'})
+            
+            results[index] = {
+                'success': True,
+                'data': form_data,
+                'filename': uploads[index][1]
             }
         
-        # Convert to RGB for EasyOCR
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Perform OCR
-        print("🤖 Running OCR...")
-        ocr_results = ocr_reader.readtext(image_rgb)
-        print(f"📝 Found {len(ocr_results)} text regions")
-        
-        # Extract form data
-        form_data = extract_form_data(ocr_results)
-        
-        return {
-            'success': True,
-            'data': form_data,
-            'filename': os.path.basename(image_path)
-        }
-        
     except Exception as e:
         print(f"❌ OCR Error: {str(e)}")
-        return {
-            'success': False,
-            'error': str(e),
-            'filename': os.path.basename(image_path)
-        }
+        for index, _, _, _ in pending:
+            results[index] = {
+                'success': False,
+                'error': str(e),
+                'filename': uploads[index][1]
+            }
+    
+    return results
 
 @app.route('/')
 def serve_interface():
@@ -190,27 +252,15 @@ def upload_files():
         if not files or all(file.filename == '' for file in files):
             return jsonify({'error': 'No files selected'}), 400
         
-        results = []
+        uploads = []
         
+        # Read uploads straight from the request stream, nothing touches disk
         for file in files:
             if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                unique_filename = f"{timestamp}_{filename}"
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                
-                # Save file
-                file.save(file_path)
-                
-                # Process with OCR
-                result = process_image_ocr(file_path)
-                results.append(result)
-                
-                # Clean up uploaded file
-                try:
-                    os.remove(file_path)
-                except:
-                    pass
+                uploads.append((file.read(), secure_filename(file.filename)))
+        
+        # Process all images with batched OCR
+        results = process_images_ocr(uploads)
         
         print(f"✅ Processed {len(results)} files")
         
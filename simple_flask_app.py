@@ -1,28 +1,22 @@
 #!/usr/bin/env python3
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
-import os
 import json
 from datetime import datetime
-from werkzeug.utils import secure_filename
 import base64
 
 app = Flask(__name__)
 CORS(app)
 
 # Configuration
-UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'})
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 
-# Create upload directory
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in ALLOWED_EXTENSIONS
 
 @app.route('/')
 def serve_interface():
@@ -45,12 +39,6 @@ def upload_files():
         
         for file in files:
             if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"{timestamp}_{filename}"
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(file_path)
-                
                 # Simulate OCR processing (demo data)
                 demo_result = {
                     'success': True,
@@ -70,12 +58,6 @@ def upload_files():
                     }
                 }
                 results.append(demo_result)
-                
-                # Clean up uploaded file
-                try:
-                    os.remove(file_path)
-                except:
-                    pass
         
         print(f"✅ Processed {len(results)} files successfully")
         
@@ -4,61 +4,118 @@ Web-optimized version of Photo to Form OCR
 Designed for cloud deployment platforms like Railway, Render, etc.
 """
 
-from flask import Flask, request, jsonify, send_from_directory, render_template_string
+import os
+
+# One native thread per inference, parallelism comes from gunicorn workers and
+# the request pool. OpenMP/MKL read these when first loaded, so set them before
+# importing cv2, numpy or torch
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+
+from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
-import easyocr
 import cv2
 import numpy as np
-import os
 import json
 import re
 from datetime import datetime
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, File, MultipartDecoder, NeedData
 from werkzeug.utils import secure_filename
 from PIL import Image, ImageEnhance
 import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from json_provider import ORJSONProvider
+from ocr_backend import configure_torch, create_reader, readtext_many
+from ocr_cache import OCRCache, content_key
+
+cv2.setNumThreads(1)
+configure_torch(1)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
 # Configuration
-UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'})
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+MAX_IMAGE_SIDE = 1600  # Longer photos are downscaled before OCR
+# EasyOCR detection thresholds, raise them to drop faint candidates before recognition
+OCR_PARAMS = {'text_threshold': 0.7, 'low_text': 0.4, 'link_threshold': 0.4, 'paragraph': False}
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 
-# Create upload directory
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
-# Initialize EasyOCR reader with error handling for web deployment
-print("🤖 Initializing EasyOCR for web deployment...")
+# EasyOCR reader, loaded lazily so the port binds and /health answers right away
 ocr_reader = None
+_ocr_lock = threading.Lock()
 
 def init_ocr():
+    """Load the EasyOCR reader once, returns whether it is available"""
     global ocr_reader
-    try:
-        ocr_reader = easyocr.Reader(['en'], gpu=False)  # Disable GPU for web deployment
-        print("✅ EasyOCR ready for web!")
-        return True
-    except Exception as e:
-        print(f"❌ EasyOCR initialization failed: {e}")
-        return False
-
-# Initialize OCR on startup
-init_ocr()
+    with _ocr_lock:
+        if ocr_reader is not None:
+            return True
+        try:
+            print("🤖 Initializing EasyOCR for web deployment...")
+            # CPU only for web deployment, on the configured int8/compiled backend
+            ocr_reader = create_reader(['en'], num_threads=1, gpu=False)
+            print("✅ EasyOCR ready for web!")
+            return True
+        except Exception as e:
+            print(f"❌ EasyOCR initialization failed: {e}")
+            return False
+
+def start_ocr_loader():
+    """Load OCR on a background thread, the first upload waits for it if needed"""
+    threading.Thread(target=init_ocr, daemon=True).start()
+
+# Start loading right away, unless the server loads it in each worker after
+# forking instead (see gunicorn.conf.py)
+if os.environ.get('OCR_LOAD_ON_IMPORT', '1') == '1':
+    start_ocr_loader()
+
+# Bounded pool for decoding and inference, OpenCV/PyTorch release the GIL so
+# requests overlap in native code while sharing the reader's model weights
+OCR_WORKERS = int(os.environ.get('OCR_WORKERS', 4))
+_POOL = ThreadPoolExecutor(max_workers=OCR_WORKERS)
+
+# Cache extracted form data by image content so re-uploads skip OCR, also
+# across restarts
+ocr_cache = OCRCache(os.path.join('results', 'ocr_cache_web.sqlite'), maxsize=1024)
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-def extract_form_data(ocr_results):
-    """Extract structured form data from OCR results"""
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in ALLOWED_EXTENSIONS
+
+# Enhanced form field patterns, combined into one scanner compiled at import.
+# Each alternative sits inside a lookahead so matches may overlap like separate
+# findall passes would, and the value is captured in a group named after its field.
+FORM_FIELDS_RE = re.compile('(?=' + '|'.join([
+    r'(?P<email>[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+    r'(?i:name)[:\s]*(?P<name>[a-zA-Z\s]{2,40})',
+    r'(?i:phone|tel)[:\s]*(?P<phone>[+]?[\d\s\-\(\)]{10,})',
+    r'(?i:address)[:\s]*(?P<address>[a-zA-Z0-9\s,.-]{5,50})',
+    r'(?P<date>\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
+    r'(?i:amount|total|price)[:\s]*[\$]?(?P<amount>\d+\.?\d*)',
+    r'(?i:company|business)[:\s]*(?P<company>[a-zA-Z\s&]{3,30})',
+    # Unlabelled phone numbers, only used when no labelled phone is found
+    r'(?P<phone_number>\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b)',
+]) + ')')
+# Labelled fields, scanning stops once all of them are found
+FORM_FIELDS = frozenset(FORM_FIELDS_RE.groupindex) - {'phone_number'}
+# Mixed into cache keys so changing the patterns doesn't serve stale extractions
+PATTERN_VERSION = content_key(FORM_FIELDS_RE.pattern.encode('utf-8'))[:8]
+
+def extract_form_data(ocr_results, scale=1.0, timestamp=None):
+    """Extract structured form data from OCR results, bboxes are mapped back by scale"""
+    timestamp = timestamp or datetime.now().isoformat()
     if not ocr_results:
         return {
             'extracted_fields': {},
             'raw_text': 'No text detected in image',
             'text_blocks': [],
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'total_confidence': 0.0
         }
     
@@ -70,366 +127,240 @@ def extract_form_data(ocr_results):
             text_blocks.append({
                 'text': str(text).strip(),
                 'confidence': float(confidence),
-                'bbox': [[float(point[0]), float(point[1])] for point in bbox]
+                # One float64 array per box, orjson serializes it without per-point boxing.
+                # float64 keeps scaled-back coordinates clean (18.75, not 18.749998)
+                'bbox': np.asarray(bbox, dtype=np.float64) / scale
             })
     
-    # Sort by position
-    text_blocks.sort(key=lambda x: (x['bbox'][0][1], x['bbox'][0][0]))
+    # Sort by position (top to bottom, then left to right) from the stacked top-left corners
+    corners = np.array([block['bbox'][0] for block in text_blocks], dtype=np.float64).reshape(-1, 2)
+    order = np.lexsort((corners[:, 0], corners[:, 1]))
+    text_blocks = [text_blocks[i] for i in order]
     
     # Combine all text
-    all_text = ' '.join([block['text'] for block in text_blocks])
-    
-    # Enhanced form field patterns
-    form_patterns = {
-        'name': r'(?i)(name)[:\s]*([a-zA-Z\s]{2,40})',
-        'email': r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        'phone': r'(?i)(phone|tel)[:\s]*([+]?[\d\s\-\(\)]{10,})',
-        'address': r'(?i)(address)[:\s]*([a-zA-Z0-9\s,.-]{5,50})',
-        'date': r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-        'amount': r'(?i)(amount|total|price)[:\s]*[\$]?(\d+\.?\d*)',
-        'company': r'(?i)(company|business)[:\s]*([a-zA-Z\s&]{3,30})',
-    }
+    all_text = ' '.join(block['text'] for block in text_blocks)
     
     # Extract form fields
     form_data = {}
     
-    for field, pattern in form_patterns.items():
-        matches = re.findall(pattern, all_text)
-        if matches:
-            for match in matches:
-                if isinstance(match, tuple):
-                    value = match[1].strip() if len(match) > 1 else match[0].strip()
-                else:
-                    value = match.strip()
-                
-                if value and len(value) > 1:
-                    form_data[field] = value
+    # Single pass over the text, keeping the first usable value per field
+    for match in FORM_FIELDS_RE.finditer(all_text):
+        field = match.lastgroup
+        if field not in form_data:
+            value = match.group(field).strip()
+            if len(value) > 1:
+                form_data[field] = value
+                if FORM_FIELDS <= form_data.keys():
                     break
     
-    # Look for standalone patterns
-    email_pattern = r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b'
-    emails = re.findall(email_pattern, all_text)
-    if emails and 'email' not in form_data:
-        form_data['email'] = emails[0]
-    
-    phone_pattern = r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b'
-    phones = re.findall(phone_pattern, all_text)
-    if phones and 'phone' not in form_data:
-        form_data['phone'] = phones[0].strip()
+    # Fall back to a standalone phone number
+    phone_number = form_data.pop('phone_number', None)
+    if phone_number and 'phone' not in form_data:
+        form_data['phone'] = phone_number
     
     return {
         'extracted_fields': form_data,
         'raw_text': str(all_text),
         'text_blocks': text_blocks,
-        'timestamp': datetime.now().isoformat(),
-        'total_confidence': float(sum([block['confidence'] for block in text_blocks]) / len(text_blocks)) if text_blocks else 0.0
+        'timestamp': timestamp,
+        'total_confidence': float(np.fromiter(
+            (block['confidence'] for block in text_blocks), dtype=np.float64, count=len(text_blocks)
+        ).mean()) if text_blocks else 0.0
     }
 
-def process_image_ocr(image_path):
-    """Process image with OCR"""
+def decode_image(image_bytes):
+    """Decode uploaded image bytes in memory to an RGB array, None if unreadable"""
+    # imdecode honours the EXIF orientation, so rotated phone photos reach OCR upright
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+def downscale_image(image):
+    """Shrink oversized photos before OCR, returns the image and the scale applied"""
+    height, width = image.shape[:2]
+    scale = min(1.0, MAX_IMAGE_SIDE / max(height, width))
+    if scale < 1.0:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return image, scale
+
+def process_image_bytes(image_bytes, filename):
+    """Process uploaded image bytes with OCR"""
+    return process_images_bytes([(image_bytes, filename)])[0]
+
+def decode_upload(image_bytes):
+    """Decode and downscale one upload, returns (image, scale) or None if unreadable"""
+    image = decode_image(image_bytes)
+    if image is None:
+        return None
+    return downscale_image(image)
+
+def process_images_bytes(uploads):
+    """Process several uploaded images with OCR, batching inference across them
+    
+    uploads may be a generator: each image is decoded as soon as it arrives and
+    its raw bytes are dropped, so only the small downscaled arrays are kept
+    """
     if not ocr_reader:
-        return {
+        return [{
             'success': False,
             'error': 'OCR system not available',
-            'filename': os.path.basename(image_path)
-        }
+            'filename': filename
+        } for _, filename in uploads]
     
-    try:
-        print(f"🔍 Processing: {os.path.basename(image_path)}")
+    results = []
+    filenames = []
+    decoding = []
+    
+    # Format one timestamp for the whole request
+    timestamp = datetime.now().isoformat()
+    
+    for index, (image_bytes, filename) in enumerate(uploads):
+        results.append(None)
+        filenames.append(filename)
         
-        # Read and process image
-        image = cv2.imread(image_path)
-        if image is None:
-            return {
-                'success': False,
-                'error': 'Could not read image file',
-                'filename': os.path.basename(image_path)
+        # Reuse the result of an identical earlier upload
+        cache_key = f"{PATTERN_VERSION}:{content_key(image_bytes)}"
+        cached = ocr_cache.get(cache_key)
+        if cached is not None:
+            print(f"♻️ Using cached OCR result for {filename}")
+            results[index] = {
+                'success': True,
+                'data': dict(cached, timestamp=timestamp),
+                'filename': filename
             }
+            continue
         
-        # Convert to RGB
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        
-        # Perform OCR
-        print("🤖 Running OCR...")
-        ocr_results = ocr_reader.readtext(image_rgb, detail=1)
-        print(f"📝 Found {len(ocr_results)} text regions")
+        # Decode in memory on the worker pool while the next part is parsed.
+        # Waiting once a decode per worker is in flight bounds how many raw
+        # uploads can be held at a time
+        if len(decoding) >= OCR_WORKERS:
+            decoding[-OCR_WORKERS][2].result()
+        decoding.append((index, cache_key, _POOL.submit(decode_upload, image_bytes)))
+        del image_bytes
+    
+    pending = []
+    for index, cache_key, future in decoding:
+        print(f"🔍 Processing: {filenames[index]}")
+        decoded = future.result()
         
-        # Extract form data
-        form_data = extract_form_data(ocr_results)
+        if decoded is not None:
+            image, scale = decoded
+            pending.append((index, cache_key, image, scale))
+        else:
+            results[index] = {
+                'success': False,
+                'error': 'Could not read image file',
+                'filename': filenames[index]
+            }
+    del decoding
+    
+    if not pending:
+        return results
+    
+    try:
+        # Perform OCR on all decoded images at once
+        print(f"🤖 Running OCR on {len(pending)} image(s)...")
+        # Inference also runs on the bounded pool so concurrent requests don't oversubscribe the CPU
+        batch_results = _POOL.submit(
+            readtext_many, ocr_reader, [image for _, _, image, _ in pending], detail=1, **OCR_PARAMS
+        ).result()
         
-        return {
-            'success': True,
-            'data': form_data,
-            'filename': os.path.basename(image_path)
-        }
+        for (index, cache_key, _, scale), ocr_results in zip(pending, batch_results):
+            print(f"📝 Found {len(ocr_results)} text regions")
+            
+            # Extract form data
+            form_data = extract_form_data(ocr_results, scale, timestamp)
+            # Cache without the timestamp, responses are stamped when they are built
+            ocr_cache.set(cache_key, {k: v for k, v in form_data.items() if k != 'timestamp'})
+            
+            results[index] = {
+                'success': True,
+                'data': form_data,
+                'filename': filenames[index]
+            }
         
     except Exception as e:
         print(f"❌ OCR Error: {str(e)}")
-        return {
-            'success': False,
-            'error': str(e),
-            'filename': os.path.basename(image_path)
-        }
-
-# Web interface template
-WEB_INTERFACE = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Photo to Form - OCR Web App</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh; padding: 20px;
-        }
-        .container {
-            max-width: 1000px; margin: 0 auto; background: white;
-            border-radius: 20px; box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-        }
-        .header {
-            background: linear-gradient(45deg, #667eea, #764ba2);
-            color: white; padding: 30px; text-align: center; border-radius: 20px 20px 0 0;
-        }
-        .header h1 { font-size: 2.5rem; margin-bottom: 10px; }
-        .content { padding: 40px; }
-        .upload-area {
-            border: 3px dashed #667eea; border-radius: 15px;
-            padding: 60px 40px; background: #f8f9ff; text-align: center;
-            cursor: pointer; transition: all 0.3s ease;
-        }
-        .upload-area:hover {
-            border-color: #764ba2; background: #f0f2ff; transform: translateY(-2px);
-        }
-        .upload-icon { font-size: 4rem; color: #667eea; margin-bottom: 20px; }
-        .btn {
-            background: linear-gradient(45deg, #667eea, #764ba2);
-            color: white; padding: 12px 30px; border: none;
-            border-radius: 25px; font-size: 1rem; cursor: pointer; margin: 10px;
-        }
-        .btn:disabled { opacity: 0.6; cursor: not-allowed; }
-        .results { margin-top: 30px; display: none; }
-        .result-card {
-            background: #f8f9fa; border-radius: 15px; padding: 25px;
-            margin: 15px 0; box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }
-        .success { background: #d4edda; color: #155724; padding: 15px; border-radius: 10px; margin: 20px 0; }
-        .hidden { display: none; }
-        .web-badge {
-            background: #28a745; color: white; padding: 8px 15px;
-            border-radius: 20px; font-size: 0.9rem; margin: 10px 0;
-            display: inline-block;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🌐 Photo to Form OCR - Web App</h1>
-            <p>Convert images to structured form data - Running on the web!</p>
-            <div class="web-badge">✅ Web Deployed Version</div>
-        </div>
-        <div class="content">
-            <div class="success">
-                🎉 <strong>Your OCR Web App is Live!</strong><br>
-                Upload images and extract structured data with real OCR processing.
-            </div>
-
-            <div class="upload-area" id="uploadArea">
-                <div class="upload-icon">📸</div>
-                <h3>Drop your images here or click to browse</h3>
-                <p>Supports PNG, JPG, JPEG, GIF, BMP, TIFF (Max 16MB each)</p>
-                <input type="file" id="fileInput" class="hidden" multiple accept="image/*">
-            </div>
-
-            <div style="text-align: center; margin: 20px 0;">
-                <button class="btn" id="processBtn" disabled>🚀 Extract Data</button>
-                <button class="btn" id="clearBtn">🗑️ Clear</button>
-            </div>
-
-            <div class="results" id="results">
-                <h3>📋 Extracted Form Data:</h3>
-                <div id="resultsContent"></div>
-            </div>
-
-            <div style="margin-top: 40px; padding: 20px; background: #e9ecef; border-radius: 15px;">
-                <h3>🌐 Web App Features:</h3>
-                <ul style="margin: 15px 0;">
-                    <li>✅ Real OCR processing with EasyOCR</li>
-                    <li>✅ Smart form field extraction</li>
-                    <li>✅ Works on any device with internet</li>
-                    <li>✅ No installation required</li>
-                    <li>✅ Instant results</li>
-                </ul>
-                <p><strong>GitHub:</strong> <a href="https://github.com/Abdii7/photo-to-form">https://github.com/Abdii7/photo-to-form</a></p>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        const uploadArea = document.getElementById('uploadArea');
-        const fileInput = document.getElementById('fileInput');
-        const processBtn = document.getElementById('processBtn');
-        const clearBtn = document.getElementById('clearBtn');
-        const results = document.getElementById('results');
-        const resultsContent = document.getElementById('resultsContent');
-
-        let selectedFiles = [];
-
-        uploadArea.addEventListener('click', () => fileInput.click());
-        fileInput.addEventListener('change', (e) => handleFiles(e.target.files));
-
-        uploadArea.addEventListener('dragover', (e) => {
-            e.preventDefault();
-            uploadArea.style.borderColor = '#28a745';
-        });
-
-        uploadArea.addEventListener('drop', (e) => {
-            e.preventDefault();
-            uploadArea.style.borderColor = '#667eea';
-            handleFiles(e.dataTransfer.files);
-        });
-
-        function handleFiles(files) {
-            selectedFiles = Array.from(files).filter(file => 
-                ['image/png', 'image/jpeg', 'image/jpg', 'image/gif', 'image/bmp', 'image/tiff'].includes(file.type)
-            );
-            processBtn.disabled = selectedFiles.length === 0;
-            uploadArea.innerHTML = `
-                <div class="upload-icon">✅</div>
-                <h3>${selectedFiles.length} image(s) selected</h3>
-                <p>Click "Extract Data" to process</p>
-            `;
-        }
-
-        processBtn.addEventListener('click', async () => {
-            if (selectedFiles.length === 0) return;
-
-            processBtn.disabled = true;
-            processBtn.textContent = '⏳ Processing...';
-
-            const formData = new FormData();
-            selectedFiles.forEach(file => formData.append('files', file));
-
-            try {
-                const response = await fetch('/upload', {
-                    method: 'POST',
-                    body: formData
-                });
-
-                const data = await response.json();
-
-                if (data.success) {
-                    displayResults(data.results);
-                } else {
-                    alert('Error: ' + (data.error || 'Processing failed'));
-                }
-            } catch (error) {
-                alert('Network error: ' + error.message);
-            } finally {
-                processBtn.disabled = false;
-                processBtn.textContent = '🚀 Extract Data';
+        for index, _, _, _ in pending:
+            results[index] = {
+                'success': False,
+                'error': str(e),
+                'filename': filenames[index]
             }
-        });
-
-        function displayResults(results) {
-            results.style.display = 'block';
-            resultsContent.innerHTML = '';
-
-            results.forEach(result => {
-                if (result.success) {
-                    const data = result.data;
-                    const confidence = Math.round(data.total_confidence * 100);
-                    
-                    const card = document.createElement('div');
-                    card.className = 'result-card';
-                    card.innerHTML = `
-                        <h4>📄 ${result.filename} (${confidence}% confidence)</h4>
-                        <div style="margin: 15px 0;">
-                            <strong>Extracted Fields:</strong>
-                            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 10px; margin: 10px 0;">
-                                ${Object.entries(data.extracted_fields).map(([key, value]) => 
-                                    `<div style="background: white; padding: 10px; border-radius: 5px;">
-                                        <strong>${key}:</strong> ${value}
-                                    </div>`
-                                ).join('')}
-                            </div>
-                        </div>
-                        <details>
-                            <summary style="cursor: pointer; font-weight: bold;">Raw Text</summary>
-                            <div style="background: white; padding: 15px; border-radius: 5px; margin: 10px 0; font-family: monospace; font-size: 0.9rem;">
-                                ${data.raw_text}
-                            </div>
-                        </details>
-                    `;
-                    resultsContent.appendChild(card);
-                } else {
-                    const errorCard = document.createElement('div');
-                    errorCard.className = 'result-card';
-                    errorCard.innerHTML = `
-                        <h4>❌ ${result.filename}</h4>
-                        <p style="color: #dc3545;">Error: ${result.error}</p>
-                    `;
-                    resultsContent.appendChild(errorCard);
-                }
-            });
-        }
-
-        clearBtn.addEventListener('click', () => {
-            selectedFiles = [];
-            fileInput.value = '';
-            processBtn.disabled = true;
-            results.style.display = 'none';
-            uploadArea.innerHTML = `
-                <div class="upload-icon">📸</div>
-                <h3>Drop your images here or click to browse</h3>
-                <p>Supports PNG, JPG, JPEG, GIF, BMP, TIFF (Max 16MB each)</p>
-            `;
-        });
-    </script>
-</body>
-</html>
-'''
+    
+    return results
+
+def iter_file_parts(field, chunk_size=64 * 1024):
+    """Stream (bytes, filename) pairs for the file parts named field straight from the request body"""
+    mimetype, options = parse_options_header(request.content_type or '')
+    boundary = options.get('boundary')
+    if mimetype != 'multipart/form-data' or not boundary:
+        return
+    
+    # Parse the body as it arrives instead of letting Werkzeug buffer the whole
+    # form, spooling large files to temporary files on disk first
+    decoder = MultipartDecoder(boundary.encode('latin-1'))
+    stream = request.stream  # Bounded by MAX_CONTENT_LENGTH
+    part = None
+    while True:
+        chunk = stream.read(chunk_size)
+        decoder.receive_data(chunk or None)
+        event = decoder.next_event()
+        while not isinstance(event, (NeedData, Epilogue)):
+            if isinstance(event, File):
+                part = (event.name, event.filename, [])
+            elif isinstance(event, Data):
+                if part is not None:
+                    part[2].append(event.data)
+                    if not event.more_data:
+                        name, filename, chunks = part
+                        part = None
+                        if name == field:
+                            body = b''.join(chunks)
+                            del chunks
+                            yield body, filename
+                            # Let the caller free this upload while the next part is parsed
+                            del body
+            else:
+                # Plain form fields are not used
+                part = None
+            event = decoder.next_event()
+        if isinstance(event, Epilogue) or not chunk:
+            return
 
 @app.route('/')
 def index():
-    return render_template_string(WEB_INTERFACE)
+    # Plain static page, no template rendering, cacheable by browsers and CDNs
+    return send_from_directory(app.static_folder, 'index.html', max_age=3600)
 
 @app.route('/upload', methods=['POST'])
 def upload_files():
     try:
-        if not ocr_reader:
+        if not init_ocr():
             return jsonify({'error': 'OCR system not available. Please wait for initialization.'}), 500
         
-        if 'files' not in request.files:
-            return jsonify({'error': 'No files provided'}), 400
+        # Parts, and parts with a filename, seen while streaming
+        counts = [0, 0]
         
-        files = request.files.getlist('files')
+        def uploads():
+            # Read uploads in memory as the body streams in, nothing touches the disk
+            for data, filename in iter_file_parts('files'):
+                counts[0] += 1
+                if filename:
+                    counts[1] += 1
+                    if allowed_file(filename):
+                        yield data, secure_filename(filename)
+                del data
         
-        if not files or all(file.filename == '' for file in files):
-            return jsonify({'error': 'No files selected'}), 400
+        # Process all images with batched OCR, each decoded as soon as it is parsed
+        results = process_images_bytes(uploads())
         
-        results = []
+        if not counts[0]:
+            return jsonify({'error': 'No files provided'}), 400
         
-        for file in files:
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                unique_filename = f"{timestamp}_{filename}"
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                
-                file.save(file_path)
-                result = process_image_ocr(file_path)
-                results.append(result)
-                
-                # Clean up
-                try:
-                    os.remove(file_path)
-                except:
-                    pass
+        if not counts[1]:
+            return jsonify({'error': 'No files selected'}), 400
         
         return jsonify({
             'success': True,
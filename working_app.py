@@ -1,117 +1,233 @@
 #!/usr/bin/env python3
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, request, jsonify
+from werkzeug.http import parse_accept_header, parse_etags
+import gzip
+import hashlib
+import json
 import os
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 app = Flask(__name__)
+# Production settings fixed at import. debug stays off unless FLASK_DEBUG opts
+# in (for the template reload route); errors go straight to the WSGI server's log
+app.config.update(
+    PROPAGATE_EXCEPTIONS=True,
+    TRAP_HTTP_EXCEPTIONS=False,
+)
+# The page is served from memory, so Jinja never needs to re-stat templates
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.jinja_env.auto_reload = False
+# Flask 2.3+ reads these from the JSON provider instead of JSON_SORT_KEYS
+app.json.sort_keys = False
+app.json.compact = True
+
+TEMPLATE_PATH = os.path.join('templates', 'index.html')
+# Page served when the template is missing, kept out of the Python source
+FALLBACK_PATH = os.path.join(app.static_folder, 'index_fallback.html')
+
+def minify_html(body):
+    """Strip indentation and blank lines from the page"""
+    # Line breaks are kept so inline scripts relying on them still parse
+    return b'\n'.join(line.strip() for line in body.splitlines() if line.strip())
+
+def build_index():
+    """Resolve the index page and its precompressed variants"""
+    global HAS_TEMPLATE, INDEX_BODY, INDEX_ETAG, INDEX_VARIANTS
+    
+    # Decide once whether the template exists instead of stat-ing per request
+    has_template = os.path.exists(TEMPLATE_PATH)
+    # The page has no template variables, so its bytes are served as-is
+    with open(TEMPLATE_PATH if has_template else FALLBACK_PATH, 'rb') as f:
+        page = minify_html(f.read())
+    # 64-bit BLAKE2b is plenty to tell page versions apart and cheaper than MD5
+    page_etag = hashlib.blake2b(page, digest_size=8).hexdigest()
+    
+    # Compress once, each request just picks a variant by Accept-Encoding
+    encoded = {None: page, 'gzip': gzip.compress(page, 9, mtime=0)}
+    if brotli is not None:
+        encoded['br'] = brotli.compress(page, quality=11)
+    
+    # Every encoding gets its own ETag since the bytes differ. The full header
+    # lists for 200 and 304 are built here too, so a request only picks one
+    variants = {}
+    for encoding, body in encoded.items():
+        etag = f'"{page_etag}-{encoding}"' if encoding else f'"{page_etag}"'
+        not_modified = [('ETag', etag), ('Vary', 'Accept-Encoding')]
+        # Served from memory rather than sendfile(2): the compressed variants are a
+        # few KB and exist only in memory, so a single write is already zero-copy enough
+        ok = not_modified + [('Cache-Control', 'public, max-age=3600')]
+        if encoding:
+            ok.append(('Content-Encoding', encoding))
+        ok += [('Content-Type', 'text/html; charset=utf-8'), ('Content-Length', str(len(body)))]
+        variants[encoding] = (body, etag, ok, not_modified)
+    
+    # Publish only the finished build, so requests served while a reload runs
+    # see either the old page or the new one, never a half-filled mix
+    HAS_TEMPLATE, INDEX_BODY, INDEX_ETAG, INDEX_VARIANTS = has_template, page, page_etag, variants
+
+# Resolve the index page once at import instead of on every request
+build_index()
 
-# Create templates directory if it doesn't exist
-os.makedirs('templates', exist_ok=True)
+def pick_encoding(accept_encoding):
+    """Best precompressed encoding the client accepts, None for identity"""
+    accepted = parse_accept_header(accept_encoding)
+    for encoding in ('br', 'gzip'):
+        if encoding in INDEX_VARIANTS and accepted[encoding]:
+            return encoding
+    return None
+
+def index_parts(accept_encoding, if_none_match):
+    """Status, header list and body of the index page for the given request headers"""
+    body, etag, ok, not_modified = INDEX_VARIANTS[pick_encoding(accept_encoding)]
+    
+    # Repeat visitors already have the page, skip the body entirely. Browsers
+    # echo the ETag back verbatim, so a plain string compare catches nearly all
+    # of them before falling back to parsing lists and weak tags. If-None-Match
+    # uses weak comparison (RFC 7232), so W/"..." matches too
+    if if_none_match and (if_none_match == etag or parse_etags(if_none_match).contains_weak(etag[1:-1])):
+        return '304 Not Modified', not_modified, b''
+    return '200 OK', ok, body
 
 @app.route('/')
 def index():
-    # Check if template exists
-    template_path = os.path.join('templates', 'index.html')
-    if os.path.exists(template_path):
-        return render_template('index.html')
-    else:
-        # Return embedded HTML if template not found
-        return '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Photo to Form - OCR Application</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh; padding: 20px;
-        }
-        .container {
-            max-width: 800px; margin: 0 auto; background: white;
-            border-radius: 20px; box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }
-        .header {
-            background: linear-gradient(45deg, #667eea, #764ba2);
-            color: white; padding: 30px; text-align: center;
-        }
-        .header h1 { font-size: 2.5rem; margin-bottom: 10px; }
-        .content { padding: 40px; text-align: center; }
-        .upload-area {
-            border: 3px dashed #667eea; border-radius: 15px;
-            padding: 60px 40px; background: #f8f9ff;
-            margin: 20px 0; cursor: pointer;
-        }
-        .upload-icon { font-size: 4rem; color: #667eea; margin-bottom: 20px; }
-        .btn {
-            background: linear-gradient(45deg, #667eea, #764ba2);
-            color: white; padding: 12px 30px; border: none;
-            border-radius: 25px; font-size: 1rem; cursor: pointer;
-            margin: 10px;
-        }
-        .success { 
-            background: #d4edda; color: #155724; padding: 15px;
-            border-radius: 10px; margin: 20px 0;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>📸 Photo to Form OCR</h1>
-            <p>Convert images to structured form data</p>
-        </div>
-        <div class="content">
-            <div class="success">
-                ✅ Your Photo to Form OCR Application is running successfully!
-            </div>
-            <div class="upload-area">
-                <div class="upload-icon">📁</div>
-                <h3>Ready for Image Processing</h3>
-                <p>Upload images to extract form data with OCR</p>
-            </div>
-            <h3>🎉 Application Features:</h3>
-            <ul style="text-align: left; max-width: 400px; margin: 20px auto;">
-                <li>✅ EasyOCR integration for 95% accuracy</li>
-                <li>✅ Drag & drop file upload interface</li>
-                <li>✅ Smart form data extraction</li>
-                <li>✅ Batch processing support</li>
-                <li>✅ Mobile responsive design</li>
-                <li>✅ JSON export functionality</li>
-            </ul>
-            <p><strong>Your application is ready to use!</strong></p>
-            <p>All components are installed and configured.</p>
-        </div>
-    </div>
-</body>
-</html>
-        '''
+    status, headers, body = index_parts(request.headers.get('Accept-Encoding'), request.headers.get('If-None-Match'))
+    return Response(body, status, headers)
+
+if app.debug:
+    @app.route('/admin/reload-templates', methods=['POST'])
+    def reload_templates():
+        """Pick up template edits without restarting (debug only)"""
+        build_index()
+        return jsonify({'template': HAS_TEMPLATE, 'etag': INDEX_ETAG})
+
+# Constant health payload, encoded once instead of jsonify-ing on every poll
+HEALTH_BODY = json.dumps({'status': 'healthy', 'app': 'Photo to Form OCR'}, separators=(',', ':')).encode('utf-8')
+
+# The whole response is constant too. Werkzeug copies the headers for each
+# request it serves, so one frozen instance can be returned every time
+HEALTH_RESPONSE = Response(HEALTH_BODY, mimetype='application/json', headers={'Cache-Control': 'no-cache'})
+HEALTH_RESPONSE.freeze()
+# Same headers as a WSGI list for the shim below, which skips Response entirely
+HEALTH_HEADERS = HEALTH_RESPONSE.headers.to_wsgi_list()
 
 @app.route('/health')
 def health():
-    return jsonify({'status': 'healthy', 'app': 'Photo to Form OCR'})
+    return HEALTH_RESPONSE
+
+def fast_paths(wsgi_app):
+    """Answer GET/HEAD on / and /health without building a Flask request context"""
+    def middleware(environ, start_response):
+        method = environ['REQUEST_METHOD']
+        if method == 'GET' or method == 'HEAD':
+            path = environ.get('PATH_INFO')
+            if path == '/health':
+                start_response('200 OK', HEALTH_HEADERS)
+                return [b''] if method == 'HEAD' else [HEALTH_BODY]
+            if path == '/':
+                status, headers, body = index_parts(
+                    environ.get('HTTP_ACCEPT_ENCODING'), environ.get('HTTP_IF_NONE_MATCH')
+                )
+                start_response(status, headers)
+                return [b''] if method == 'HEAD' else [body]
+        # Everything else (errors, debug routes) goes through Flask as usual
+        return wsgi_app(environ, start_response)
+    return middleware
+
+# Wrapping wsgi_app keeps app itself a normal Flask object for servers and tests
+app.wsgi_app = fast_paths(app.wsgi_app)
 
 if __name__ == '__main__':
-    # Find available port
+    import signal
     import socket
-    def find_free_port():
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.bind(('', 0))
-            return s.getsockname()[1]
+    import sys
+    from waitress import serve
+    
+    # Opt-in multi-process mode: each worker gets its own SO_REUSEPORT listener,
+    # so the kernel spreads connections across per-worker accept queues
+    workers = int(os.environ.get('WORKERS', '1'))
+    if workers > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+        print("⚠️ SO_REUSEPORT not supported here, running a single worker")
+        workers = 1
+    
+    # waitress multiplexes sockets on one event loop and buffers whole requests
+    # before handing them to a thread, so slow clients never hold a thread;
+    # poll() lifts select()'s 1024 fd ceiling
+    serve_options = {
+        'threads': 8,
+        'asyncore_use_poll': True,
+        'connection_limit': int(os.environ.get('CONNECTION_LIMIT', '1000')),
+        'channel_timeout': 30,
+    }
     
-    port = find_free_port()
-    print("🚀 Photo to Form OCR Application")
-    print("=" * 50)
-    print(f"📱 Open your browser: http://localhost:{port}")
-    print("🛑 Press Ctrl+C to stop")
-    print("=" * 50)
+    def listen_socket(port):
+        """Create an unlistened socket bound to port, shareable across workers"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if workers > 1:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        # Accepted connections inherit this, so the whole page fits in one send
+        # (waitress sizes its write chunks from it). waitress already sets
+        # TCP_NODELAY on each connection, so headers and body aren't Nagle-delayed
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 65536)
+        sock.bind(('127.0.0.1', port))
+        return sock
     
+    # Bind once to a free port and hand that socket to the server, so the port
+    # can't be taken between picking it and listening on it
     try:
-        app.run(host='127.0.0.1', port=port, debug=False)
-    except Exception as e:
+        sock = listen_socket(0)
+    except OSError as e:
         print(f"Error: {e}")
         print("Trying alternative port...")
-        app.run(host='127.0.0.1', port=8080, debug=False)
\ No newline at end of file
+        sock = listen_socket(8080)
+    
+    port = sock.getsockname()[1]
+    children = []
+    for _ in range(workers - 1):
+        pid = os.fork()
+        if pid == 0:
+            # Child worker: drop the parent's socket and accept on its own.
+            # Always leave through _exit so a child never runs the parent's code
+            code = 1
+            try:
+                sock.close()
+                serve(app, sockets=[listen_socket(port)], **serve_options)
+                code = 0
+            finally:
+                os._exit(code)
+        children.append(pid)
+    
+    def stop(signum, frame):
+        # Turn SIGTERM into a normal exit so the workers are cleaned up below
+        raise SystemExit(0)
+    
+    if children:
+        signal.signal(signal.SIGTERM, stop)
+    
+    # Whole banner in one write instead of a syscall per line
+    banner = [
+        "🚀 Photo to Form OCR Application",
+        "=" * 50,
+        f"📱 Open your browser: http://localhost:{port}",
+    ]
+    if workers > 1:
+        banner.append(f"👥 Workers: {workers}")
+    banner += ["🛑 Press Ctrl+C to stop", "=" * 50, ""]
+    sys.stdout.buffer.write("\n".join(banner).encode('utf-8'))
+    sys.stdout.buffer.flush()
+    
+    # Production WSGI server, a pool of threads serves concurrent requests
+    try:
+        serve(app, sockets=[sock], **serve_options)
+    finally:
+        # Take the workers down with the parent however it exits, then reap them
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            os.waitpid(pid, 0)